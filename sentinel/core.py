@@ -2,18 +2,46 @@ import math
 import struct
 import binascii
 from collections import Counter
+from itertools import chain
+
+# n*log2(n) for every count a chunk of up to _XLOG2X_MAX bytes can produce, so the
+# entropy sum is a table lookup per nonzero bin instead of a log2 call
+_XLOG2X_MAX = 1 << 16
+_XLOG2X = [0.0] + [n * math.log2(n) for n in range(1, _XLOG2X_MAX + 1)]
 
 class FastMath:
     @staticmethod
-    def entropy(data):
+    def byte_histogram(data):
+        """Byte value -> occurrence count, tallied in a single C-level pass."""
+        # Uniform runs (zero padding, erased 0xFF flash) are common; count() settles them at memchr speed
+        if data and data.count(data[:1]) == len(data): return Counter({data[0]: len(data)})
+        return Counter(data)
+
+    @staticmethod
+    def entropy(data, counts=None):
         if not data: return 0
         len_data = len(data)
-        counts = Counter(data)
-        ent = 0.0
-        for count in counts.values():
-            p = count / len_data
-            if p > 0: ent -= p * math.log2(p)
-        return ent
+        if counts is None: counts = FastMath.byte_histogram(data)
+        # A single symbol is exactly zero; the difference below can round to -1e-15 instead
+        if len(counts) == 1: return 0.0
+        # H = log2(n) - sum(c*log2(c))/n, so only the (<= 256) nonzero bins are visited
+        if len_data <= _XLOG2X_MAX:
+            return math.log2(len_data) - sum(map(_XLOG2X.__getitem__, counts.values())) / len_data
+        return math.log2(len_data) - sum(c * math.log2(c) for c in counts.values()) / len_data
+
+# Opcode weights: 0xC3 (RET), 0x90 (NOP), 0x55 (PUSH EBP), 0x89 (MOV)
+_X86_WEIGHTS = {0xC3: 5, 0x90: 3, 0x55: 2, 0x89: 1}
+# Printable ASCII plus tab/LF/CR, as a bytes.translate deletion table
+_TEXT_BYTES = bytes(range(32, 127)) + b'\t\n\r'
+# Fixed header signatures, probed as one dict lookup per distinct prefix length (ELF is
+# handled separately since its label depends on the class byte)
+_MAGIC = {
+    b'MZ': "Windows PE Header (x86/64)",
+    b'\xca\xfe\xba\xbe': "Mac Mach-O Header",
+    b'\xfe\xed\xfa\xce': "Mac Mach-O Header",
+    b'%PDF': "PDF Document Header",
+}
+_MAGIC_LENGTHS = sorted({len(m) for m in _MAGIC}, reverse=True)
 
 class ArchID:
     """Standard Lib implementation of CPU Architecture Fingerprinting."""
@@ -23,28 +51,26 @@ class ArchID:
         length = len(data)
         if length < 4: return "Too small to analyze"
 
-        if data.startswith(b'MZ'): return "Windows PE Header (x86/64)"
+        for n in _MAGIC_LENGTHS:
+            magic = _MAGIC.get(data[:n])
+            if magic: return magic
         if data.startswith(b'\x7fELF'):
             return "Linux ELF Header " + ("(64-bit)" if data[4] == 2 else "(32-bit)")
-        if data.startswith(b'\xca\xfe\xba\xbe') or data.startswith(b'\xfe\xed\xfa\xce'):
-            return "Mac Mach-O Header"
-        if data.startswith(b'%PDF'): return "PDF Document Header"
         
         # Entropy & Text Checks
-        ent = FastMath.entropy(data)
-        printable = sum(1 for b in data if 32 <= b <= 126 or b in [9, 10, 13])
+        counts = FastMath.byte_histogram(data)
+        ent = FastMath.entropy(data, counts)
+        printable = length - len(data.translate(None, _TEXT_BYTES))
         if printable / length > 0.90: return "ASCII Text / Source Code"
         if ent < 1.0: return "Null Padding / Zero Space"
         if ent > 7.9: return "High Entropy (Crypto/Compressed)"
 
         # Simple Heuristics for binary code
-        counts = Counter(data)
-        def freq(byte_val): return counts.get(byte_val, 0) / length
-        score_x86 = freq(0xC3) * 5 + freq(0x90) * 3 + freq(0x55) * 2 + freq(0x89)
-        score_x64 = score_x86 + (freq(0x48) * 3)
+        score_x86 = sum(counts[b] * w for b, w in _X86_WEIGHTS.items()) / length
+        score_x64 = score_x86 + (counts[0x48] / length * 3)
         score_arm64 = 0
         if length > 8:
-            nulls_aligned = sum(1 for i in range(3, length, 4) if data[i] == 0)
+            nulls_aligned = data[3::4].count(0)
             score_arm64 = (nulls_aligned / (length/4)) * 2.5
         
         scores = {"x86 (32-bit)": score_x86, "x86_64 (64-bit)": score_x64, "ARM64": score_arm64}
@@ -55,25 +81,49 @@ class ArchID:
 class BMPGenerator:
     @staticmethod
     def create_bmp(rgb_tuples):
-        count = len(rgb_tuples)
-        if count == 0: return b''
+        # Band ratios are within [0, 1], so scaling by 255 always yields a valid byte.
+        # Scale everything in one C-level map, then swizzle RGB -> BGR with strided slices.
+        rgb = bytes(map(int, map((255.0).__mul__, chain.from_iterable(rgb_tuples))))
+        bgr = bytearray(len(rgb))
+        bgr[0::3] = rgb[2::3]
+        bgr[1::3] = rgb[1::3]
+        bgr[2::3] = rgb[0::3]
+        return b''.join(BMPGenerator.stream_bmp_from_bgr(bgr)[1])
+
+    @staticmethod
+    def layout(count):
+        """(width, height, padded row size) of the near-square bitmap holding `count` pixels."""
         width = int(math.ceil(math.sqrt(count)))
         height = int(math.ceil(count / width))
-        row_size = (width * 3 + 3) & ~3
+        return width, height, (width * 3 + 3) & ~3
+
+    @staticmethod
+    def _pack_headers(out, width, height, row_size):
         pixel_array_size = row_size * height
-        file_size = 54 + pixel_array_size
-        header = struct.pack('<2sIHHI', b'BM', file_size, 0, 0, 54)
-        dib = struct.pack('<IiihhIIIIII', 40, width, -height, 1, 24, 0, pixel_array_size, 2835, 2835, 0, 0)
-        pixel_data = bytearray()
-        for y in range(height):
-            row_data = bytearray()
-            for x in range(width):
-                idx = y * width + x
-                if idx < count:
-                    r_f, g_f, b_f = rgb_tuples[idx]
-                    row_data.extend([min(255, int(b_f*255)), min(255, int(g_f*255)), min(255, int(r_f*255))])
-                else:
-                    row_data.extend([0, 0, 0])
-            row_data.extend([0] * ((4 - (len(row_data) % 4)) % 4))
-            pixel_data.extend(row_data)
-        return header + dib + pixel_data
+        struct.pack_into('<2sIHHI', out, 0, b'BM', 54 + pixel_array_size, 0, 0, 54)
+        struct.pack_into('<IiihhIIIIII', out, 14, 40, width, -height, 1, 24, 0, pixel_array_size, 2835, 2835, 0, 0)
+
+    @staticmethod
+    def stream_bmp_from_bgr(bgr, group_bytes=1 << 16):
+        """Bitmap of packed 24-bit BGR pixels, one per chunk, as (file_size, pieces) for writing
+        straight to a socket: the headers, then groups of padded rows, so only ~group_bytes is ever held."""
+        count = len(bgr) // 3
+        if count == 0: return 0, iter(())
+        width, height, row_size = BMPGenerator.layout(count)
+        return 54 + row_size * height, BMPGenerator._iter_bmp(bgr, count, width, height, row_size, group_bytes)
+
+    @staticmethod
+    def _iter_bmp(bgr, count, width, height, row_size, group_bytes):
+        header = bytearray(54)
+        BMPGenerator._pack_headers(header, width, height, row_size)
+        yield bytes(header)
+        stride = width * 3
+        end = count * 3
+        rows_per_group = max(1, group_bytes // row_size)
+        for start in range(0, height * stride, rows_per_group * stride):
+            stop = min(start + rows_per_group * stride, height * stride)
+            group = bytearray((stop - start) // stride * row_size)
+            for o, i in zip(range(0, len(group), row_size), range(start, min(stop, end), stride)):
+                row = bgr[i:min(i + stride, end)]
+                group[o:o + len(row)] = row
+            yield bytes(group)
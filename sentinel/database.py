@@ -1,54 +1,158 @@
 import sqlite3
 import tempfile
 import os
+import sys
+import mmap
+import struct
+from array import array
+from bisect import bisect_right
+from itertools import chain
+
+INSERT_SQL = "INSERT INTO chunks (offset, length, entropy, r_val, g_val, b_val, anom_score, flux_type) VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+# Multi-row VALUES: one statement step per group instead of per row. 100 rows x 8 params
+# stays under the 999-variable limit of older SQLite builds.
+INSERT_GROUP_ROWS = 100
+INSERT_GROUP_SQL = INSERT_SQL + ", (?, ?, ?, ?, ?, ?, ?, ?)" * (INSERT_GROUP_ROWS - 1)
+# Binary page layout served by /data and embedded (base64) in the report: a little-endian
+# (count, total) header, then one column per field so the browser can view each in place:
+# offset f64, length u32, entropy f32, anomaly score f32, cell colour u32, then r/g/b ratios
+# and flux type as u8. Every column starts aligned for its element size.
+PAGE_HEADER = struct.Struct('<II')
+PAGE_COLUMNS = ('d', 'I', 'f', 'f', 'I')
+# Cell colour as the viewer's canvas word (0xAABBGGRR): a fixed palette colour for a dominant
+# band, otherwise the band ratios scaled to bytes. Evaluated by SQLite as rows are read.
+PIXEL_SQL = ("CASE WHEN r_val > 0.8 THEN 0xFF756CE0 WHEN g_val > 0.8 THEN 0xFF79C398 WHEN b_val > 0.8 THEN 0xFFEFAF61 "
+             "ELSE 0xFF000000 | (CAST(b_val * 255 AS INTEGER) << 16) | (CAST(g_val * 255 AS INTEGER) << 8) "
+             "| CAST(r_val * 255 AS INTEGER) END")
 
 class DataEngine:
     def __init__(self):
         self.tmp_db = tempfile.NamedTemporaryFile(delete=False)
         self.db_path = self.tmp_db.name
         self.tmp_db.close()
-        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        # Autocommit mode: the module never opens transactions implicitly, ingest brackets its own
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
         self.cursor = self.conn.cursor()
+        self._total = None
+        self._starts = None
+        # Spectral sidecar: one packed BGR pixel per chunk, appended in insert order. The BMP
+        # export reads it back in one go instead of walking every row of the table.
+        self.spec_path = self.db_path + '.spec'
+        self.spec_f = open(self.spec_path, 'wb+')
         self._init_db()
 
     def _init_db(self):
+        # Scratch database: durability is irrelevant, ingest throughput is not
+        self.cursor.executescript("""
+            PRAGMA journal_mode=WAL;
+            PRAGMA synchronous=OFF;
+            PRAGMA temp_store=MEMORY;
+            PRAGMA cache_size=-65536;
+            PRAGMA locking_mode=EXCLUSIVE;
+        """)
         self.cursor.execute("""
             CREATE TABLE IF NOT EXISTS chunks (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                id INTEGER PRIMARY KEY,
                 offset INTEGER, length INTEGER, entropy REAL,
                 r_val REAL, g_val REAL, b_val REAL,
                 anom_score REAL, flux_type INTEGER
             )
         """)
-        self.cursor.execute("CREATE INDEX idx_id ON chunks(id)")
-        self.conn.commit()
+
+    def begin_ingest(self):
+        self.cursor.execute("BEGIN")
+
+    def end_ingest(self):
+        self.cursor.execute("COMMIT")
+        # Rows are static from here on; count once instead of a COUNT(*) scan per /data page
+        self._total = self.cursor.execute("SELECT COUNT(*) FROM chunks").fetchone()[0]
 
     def insert_bulk(self, data_tuples):
-        self.cursor.executemany(
-            "INSERT INTO chunks (offset, length, entropy, r_val, g_val, b_val, anom_score, flux_type) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
-            data_tuples
-        )
-        self.conn.commit()
-
-    def get_page(self, page_num, page_size):
-        offset = page_num * page_size
-        self.cursor.execute(
-            "SELECT offset, length, entropy, r_val, g_val, b_val, anom_score, flux_type FROM chunks LIMIT ? OFFSET ?",
-            (page_size, offset)
-        )
-        rows = self.cursor.fetchall()
-        return [(r[0], r[1], r[2], r[3], r[4], r[5]) for r in rows], [(round(r[6], 2), r[7]) for r in rows]
-
-    def get_all_spectral_data(self):
-        self.cursor.execute("SELECT r_val, g_val, b_val FROM chunks ORDER BY id ASC")
-        return self.cursor.fetchall()
+        rows = data_tuples if isinstance(data_tuples, list) else list(data_tuples)
+        self._total = self._starts = None
+        # (b, g, r) of each row; ratios are within [0, 1] so int(x*255) is always a byte
+        self.spec_f.write(bytes(map(int, map((255.0).__mul__, chain.from_iterable(row[5:2:-1] for row in rows)))))
+        grouped = len(rows) - len(rows) % INSERT_GROUP_ROWS
+        for i in range(0, grouped, INSERT_GROUP_ROWS):
+            self.cursor.execute(INSERT_GROUP_SQL, list(chain.from_iterable(rows[i:i + INSERT_GROUP_ROWS])))
+        if grouped < len(rows):
+            self.cursor.executemany(INSERT_SQL, rows[grouped:])
+
+    def get_page_packed(self, page_num, page_size):
+        """A page in the PAGE_HEADER + PAGE_COLUMNS layout the viewer maps typed arrays onto."""
+        # Ids are 1..N in scan order (append-only table), so a page is a rowid range seek
+        # rather than an OFFSET that steps over every earlier row
+        rows = self.conn.execute(
+            "SELECT offset, length, entropy, anom_score, " + PIXEL_SQL + ", r_val, g_val, b_val, flux_type "
+            "FROM chunks WHERE id > ? ORDER BY id LIMIT ?",
+            (page_num * page_size, page_size)
+        ).fetchall()
+        return self._pack_page(rows, self.get_total_count())
+
+    def get_agg_packed(self, page_num, page_size, bucket):
+        """Like get_page_packed, but each row summarises `bucket` consecutive chunks: their byte
+        span, mean entropy, length-weighted band ratios and strongest anomaly. GROUP BY on the
+        rowid range keeps the reduction inside SQLite."""
+        first = page_num * page_size * bucket
+        rows = self.conn.execute(
+            "SELECT o, l, e, a, " + PIXEL_SQL + ", r_val, g_val, b_val, f FROM ("
+            "SELECT MIN(offset) AS o, SUM(length) AS l, AVG(entropy) AS e, MAX(anom_score) AS a, "
+            # x / 0 is NULL in SQLite: an all-empty bucket gets zero ratios
+            "IFNULL(SUM(r_val * length) / SUM(length), 0) AS r_val, IFNULL(SUM(g_val * length) / SUM(length), 0) AS g_val, "
+            "IFNULL(SUM(b_val * length) / SUM(length), 0) AS b_val, "
+            "MAX(flux_type) AS f FROM chunks WHERE id > ? AND id <= ? GROUP BY (id - 1) / ? ORDER BY 1)",
+            (first, first + page_size * bucket, bucket)
+        ).fetchall()
+        return self._pack_page(rows, -(-self.get_total_count() // bucket))
+
+    @staticmethod
+    def _pack_page(rows, total):
+        cols = list(zip(*rows)) if rows else [()] * 9
+        out = [PAGE_HEADER.pack(len(rows), total)]
+        for typecode, col in zip(PAGE_COLUMNS, cols[:5]):
+            a = array(typecode, col)
+            if sys.byteorder == 'big': a.byteswap()
+            out.append(a.tobytes())
+        # Band ratios as bytes (ratio*255) for the live stats; then flux type
+        for col in cols[5:8]:
+            out.append(bytes(map(int, map((255.0).__mul__, col))))
+        out.append(bytes(cols[8]))
+        return b''.join(out)
+
+    def chunk_index(self, offset):
+        """0-based index of the chunk holding file `offset` (bisect_right - 1 over chunk starts)."""
+        return self.chunk_indices((offset,))[0]
+
+    def chunk_indices(self, offsets):
+        """chunk_index of each of the ascending `offsets`: a bisect over the cached chunk starts,
+        each search starting from the previous hit."""
+        starts, out, lo = self.get_chunk_starts(), [], 0
+        for offset in offsets:
+            lo = max(lo, bisect_right(starts, offset, lo) - 1)
+            out.append(lo)
+        return out
+
+    def get_spectral_bgr(self):
+        """Packed BGR pixels for every chunk: a read-only mmap of the spectral sidecar, so
+        exporting never copies it onto the heap."""
+        self.spec_f.flush()
+        if not os.fstat(self.spec_f.fileno()).st_size: return b''
+        return mmap.mmap(self.spec_f.fileno(), 0, access=mmap.ACCESS_READ)
 
     def get_total_count(self):
-        self.cursor.execute("SELECT COUNT(*) FROM chunks")
-        res = self.cursor.fetchone()
-        return res[0] if res else 0
+        if self._total is None:
+            self._total = self.cursor.execute("SELECT COUNT(*) FROM chunks").fetchone()[0]
+        return self._total
+
+    def get_chunk_starts(self):
+        """array('q') of every chunk's start offset in id order, read once after ingest"""
+        if self._starts is None:
+            self._starts = array('q', (r[0] for r in self.conn.execute("SELECT offset FROM chunks ORDER BY id")))
+        return self._starts
 
     def close(self):
         self.conn.close()
-        try: os.unlink(self.db_path)
-        except: pass
+        self.spec_f.close()
+        for path in (self.db_path, self.spec_path):
+            try: os.unlink(path)
+            except: pass
@@ -19,7 +19,7 @@ def interactive_wizard():
     size = input(" [?] Block Size [1024]: ").strip()
     size = int(size) if size else 1024
     
-    return target, {"mode": mode, "size": size, "port": 8000, "window": 5, "name": f"Wizard {mode}"}
+    return target, {"mode": mode, "size": size, "port": 8000, "window": 5, "batch": 20000, "name": f"Wizard {mode}"}
 
 def main():
     if len(sys.argv) > 1:
@@ -30,7 +30,7 @@ def main():
         parser.add_argument("--port", type=int, default=8000)
         args = parser.parse_args()
         target = args.target
-        conf = {"mode": args.mode.upper(), "size": args.size, "port": args.port, "window": 5, "name": "CLI"}
+        conf = {"mode": args.mode.upper(), "size": args.size, "port": args.port, "window": 5, "batch": 20000, "name": "CLI"}
     else:
         target, conf = interactive_wizard()
 
@@ -45,13 +45,13 @@ def main():
 
     # 3. Process File
     try:
-        Processor.run(scanner, target, engine, conf["window"])
+        Processor.run(scanner, target, engine, conf["window"], conf["batch"])
     except KeyboardInterrupt:
         engine.close()
         return
 
     # 4. Start Server
-    ServerContext.file_path = target
+    ServerContext.set_target(target)
     ServerContext.config = conf
     ServerContext.engine = engine
     
@@ -63,7 +63,9 @@ def main():
     except KeyboardInterrupt:
         print("\n[+] Exiting.")
     finally:
-        engine.close()
+        # /load may have replaced the engine the scan started with
+        ServerContext.engine.close()
+        if ServerContext.file_map: ServerContext.file_map.close()
 
 if __name__ == "__main__":
     main()
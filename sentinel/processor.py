@@ -1,42 +1,123 @@
 import os
 import sys
+import mmap
 import concurrent.futures
-from collections import Counter
+from array import array
+from collections import deque
+from itertools import islice
 from .core import FastMath
 
-def _worker_scan(args):
-    """Must be top-level for multiprocessing pickle support"""
-    offset, data = args
-    if not data: return (offset, 0, 0.0, 0.0, 0.0, 0.0)
+# Ranges per worker task; results come back as two packed arrays per task, not a tuple per chunk.
+# Sized from the expected chunk count so each worker sees ~16 tasks, within these bounds.
+SCAN_BATCH_MIN, SCAN_BATCH_MAX = 64, 1024
+# Tasks queued per worker; bounds how far the range generator runs ahead of the results
+IN_FLIGHT_PER_WORKER = 4
+
+# Byte classes for the RGB bands; bytes.translate deletes them in C and the length drop is the count
+_BAND_HIGH_BIT = bytes(range(0x80, 0x100))
+_BAND_PRINTABLE = bytes(range(0x20, 0x7F))
+_BAND_CONTROL = bytes(range(0x00, 0x20))
+
+# Chunks at least this long with any high-bit byte are tallied word-parallel (SWAR) on the whole
+# chunk as one int: one AND + bit_count per band. translate() leaves its ASCII fast path on such
+# data, and measured 2-4x slower from 4 KB up; below that, and on pure text, it stays ahead.
+SWAR_MIN = 4096
+_SWAR = hasattr(int, 'bit_count')
+# length -> per-byte masks (0x80.., 0xE0.., 0x20..); fixed-size scans reuse a single entry
+_SWAR_MASKS = {}
+
+def _band_counts(data):
+    """(high-bit, printable, control) byte counts of a non-empty chunk"""
     length = len(data)
-    ent = FastMath.entropy(data)
-    counts = Counter(data)
-    r = sum(c for b,c in counts.items() if 0x80 <= b <= 0xFF)
-    g = sum(c for b,c in counts.items() if 0x20 <= b <= 0x7E)
-    b = sum(c for b,c in counts.items() if 0x00 <= b <= 0x1F)
-    return (offset, length, round(ent, 3), round(r/length, 3), round(g/length, 3), round(b/length, 3))
+    if _SWAR and length >= SWAR_MIN:
+        masks = _SWAR_MASKS.get(length)
+        if masks is None:
+            masks = tuple(int.from_bytes(bytes((m,)) * length, 'little') for m in (0x80, 0xE0, 0x20))
+            if len(_SWAR_MASKS) < 16: _SWAR_MASKS[length] = masks
+        n = int.from_bytes(data, 'little')
+        high = (n & masks[0]).bit_count()
+        if high:
+            # Control bytes have their top three bits clear: OR those bits down onto bit 5 of each byte
+            top = n & masks[1]
+            control = length - ((top | top >> 1 | top >> 2) & masks[2]).bit_count()
+            return high, length - high - control - data.count(0x7F), control
+    return (length - len(data.translate(None, _BAND_HIGH_BIT)),
+            length - len(data.translate(None, _BAND_PRINTABLE)),
+            length - len(data.translate(None, _BAND_CONTROL)))
+
+_WORKER_MAP = None
+
+def _init_worker(path):
+    """Maps the target once per worker so only (offset, length) pairs cross the process pipe"""
+    global _WORKER_MAP
+    with open(path, 'rb') as f:
+        _WORKER_MAP = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if os.fstat(f.fileno()).st_size else b''
+
+def _worker_scan_batch(ranges):
+    """Must be top-level for multiprocessing pickle support.
+    Returns array('q') of offset/length pairs and array('d') of entropy/r/g/b quads."""
+    spans, metrics = array('q'), array('d')
+    for offset, length in ranges:
+        data = _WORKER_MAP[offset:offset + length]
+        length = len(data)
+        spans.extend((offset, length))
+        if not data:
+            metrics.extend((0.0, 0.0, 0.0, 0.0))
+            continue
+        ent = FastMath.entropy(data)
+        r, g, b = _band_counts(data)
+        metrics.extend((ent, r/length, g/length, b/length))
+    return spans, metrics
+
+def _batched(iterable, n):
+    it = iter(iterable)
+    while True:
+        batch = list(islice(it, n))
+        if not batch: return
+        yield batch
+
+def _scan_batch_size(est_chunks, workers):
+    return max(SCAN_BATCH_MIN, min(SCAN_BATCH_MAX, est_chunks // (workers * 16)))
+
+def _map_bounded(executor, fn, iterable, depth):
+    """Ordered executor.map that submits lazily, keeping at most `depth` tasks in flight"""
+    pending = deque()
+    for item in iterable:
+        if len(pending) >= depth: yield pending.popleft().result()
+        pending.append(executor.submit(fn, item))
+    while pending: yield pending.popleft().result()
+
+def _unpack(results):
+    """Flattens packed worker results back into ((offset, length), (ent, r, g, b)) per chunk"""
+    for spans, metrics in results:
+        yield from zip(zip(*[iter(spans)] * 2), zip(*[iter(metrics)] * 4))
 
 class Processor:
     @staticmethod
-    def run(scanner, target_file, db_engine, window_size=5):
+    def run(scanner, target_file, db_engine, window_size=5, batch_size=20000):
         file_size = os.path.getsize(target_file)
         workers = max(1, (os.cpu_count() or 1) - 1)
         print(f"[+] Scanning {file_size/1024/1024:.2f} MB using {workers} workers...")
 
-        hist_ent = []
+        # Anomalies are scored inline, overlapping the workers' scan. At well under a microsecond
+        # per chunk a post-ingest pass gains nothing (a SQL window-function UPDATE measured ~6x slower).
+        # Rolling window with a running sum: O(1) per chunk regardless of window size
+        hist_ent = deque(maxlen=window_size * 2)
+        ent_sum = 0.0
         batch = []
         count = 0
         prev_ent = 0.0
 
-        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
-            chunk_gen = scanner.yield_raw_chunks(target_file)
-            for res in executor.map(_worker_scan, chunk_gen, chunksize=20):
-                offset, length, ent, r, g, b = res
-                
+        db_engine.begin_ingest()
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(target_file,)) as executor:
+            est_chunks = file_size // scanner.max_chunk_size()
+            chunk_gen = _batched(scanner.yield_chunk_ranges(target_file), _scan_batch_size(est_chunks, workers))
+            results = _map_bounded(executor, _worker_scan_batch, chunk_gen, workers * IN_FLIGHT_PER_WORKER)
+            for (offset, length), (ent, r, g, b) in _unpack(results):
                 # Anomaly Detection Logic
                 anom_score, flux_type = 0.0, 0
                 if len(hist_ent) >= window_size:
-                    diff = abs(ent - (sum(hist_ent) / len(hist_ent)))
+                    diff = abs(ent - (ent_sum / len(hist_ent)))
                     anom_score = min(1.0, diff / 2.0)
                 
                 delta = ent - prev_ent
@@ -45,16 +126,18 @@ class Processor:
                 elif ent > 7.95: flux_type, anom_score = 3, anom_score + 0.5
 
                 prev_ent = ent
+                if len(hist_ent) == hist_ent.maxlen: ent_sum -= hist_ent[0]
                 hist_ent.append(ent)
-                if len(hist_ent) > window_size * 2: hist_ent.pop(0)
+                ent_sum += ent
 
                 batch.append((offset, length, ent, r, g, b, anom_score, flux_type))
                 count += 1
-                if len(batch) >= 2000:
+                if len(batch) >= batch_size:
                     db_engine.insert_bulk(batch)
                     batch = []
                     sys.stdout.write(f"\r    Processed {count} blocks...")
                     sys.stdout.flush()
 
         if batch: db_engine.insert_bulk(batch)
+        db_engine.end_ingest()
         print(f"\n[+] Scan complete. Total blocks: {count}")
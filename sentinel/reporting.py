@@ -1,22 +1,45 @@
 import os
+import re
 import json
+import base64
+
+try:
+    import orjson
+except ImportError:  # optional; the stdlib encoder below is the zero-dependency path
+    orjson = None
+
+def json_bytes(obj):
+    """Compact UTF-8 JSON; no padding spaces in the (large) chunk arrays."""
+    if orjson: return orjson.dumps(obj)
+    return json.dumps(obj, separators=(',', ':')).encode()
 
 class ReportGenerator:
     # Use the HTML template from your original code here
     TEMPLATE = """<!DOCTYPE html>... (Paste original HTML here) ...</html>"""
+    # Served separately from /style.css so the browser caches it across page loads
+    STYLE = """/* (Paste original stylesheet here) */"""
+    STYLE_BYTES = STYLE.encode('utf-8')
+
+    # Split around the __FIELD__ placeholders once, at import; literal pieces are pre-encoded
+    _PIECES = re.split(r'(__[A-Z_]+__)', TEMPLATE)
+    _LITERALS = tuple(piece.encode('utf-8') for piece in _PIECES[0::2])
+    _FIELDS = tuple(_PIECES[1::2])
     
     @staticmethod
     def get_html(filename, config_name, db_engine):
-        if not db_engine: return "<h1>Engine Offline</h1>"
-        chunks, anoms = db_engine.get_page(0, 50000)
+        """Returns the page as a list of bytes pieces, ready to be written out in order."""
+        if not db_engine: return [b"<h1>Engine Offline</h1>"]
+        page = base64.b64encode(db_engine.get_page_packed(0, 50000))
         fsize = os.path.getsize(filename) if os.path.exists(filename) else 0
         
-        # Simple string replacement
-        h = ReportGenerator.TEMPLATE
-        h = h.replace("__FILENAME__", os.path.basename(filename).replace("\\","\\\\"))
-        h = h.replace("__FILESIZE__", str(fsize))
-        h = h.replace("__TOTAL_CHUNKS__", str(db_engine.get_total_count()))
-        h = h.replace("__DATA_JSON__", json.dumps(chunks))
-        h = h.replace("__ANOM_JSON__", json.dumps(anoms))
-        h = h.replace("__MODE_NAME__", config_name)
-        return h
+        values = {
+            "__FILENAME__": os.path.basename(filename).replace("\\","\\\\").encode('utf-8'),
+            "__FILESIZE__": str(fsize).encode(),
+            "__TOTAL_CHUNKS__": str(db_engine.get_total_count()).encode(),
+            "__PAGE_DATA__": page,
+            "__MODE_NAME__": config_name.encode('utf-8'),
+        }
+        parts = [ReportGenerator._LITERALS[0]]
+        for field, literal in zip(ReportGenerator._FIELDS, ReportGenerator._LITERALS[1:]):
+            parts += (values[field], literal)
+        return parts
@@ -1,20 +1,85 @@
 import http.server
 import socketserver
 import urllib.parse
-import json
 import os
+import mmap
 import binascii
+import threading
 from .core import ArchID, BMPGenerator
+from .database import DataEngine
 from .processor import Processor
 from .scanners import FixedScanner, SentinelScanner
-from .reporting import ReportGenerator
+from .reporting import ReportGenerator, json_bytes
+
+# Cap on matches returned by a find-all search
+SEARCH_MAX_HITS = 10000
+
+def _sendfile_range(wfile, f, offset, length):
+    """Copies f[offset:offset+length] to the client; os.sendfile keeps the bytes in the kernel"""
+    wfile.flush()
+    if hasattr(os, 'sendfile'):
+        try:
+            while length > 0:
+                sent = os.sendfile(wfile.fileno(), f.fileno(), offset, length)
+                if not sent: return
+                offset, length = offset + sent, length - sent
+            return
+        except OSError:
+            pass  # no kernel copy for this socket; finish from wherever it stopped
+    f.seek(offset)
+    while length > 0:
+        chunk = f.read(min(1 << 20, length))
+        if not chunk: break
+        wfile.write(chunk)
+        length -= len(chunk)
 
 class ServerContext:
     file_path = None
     config = None
     engine = None
+    # Read-only map of the target shared by /read and /search; swapped under the lock
+    file_map = None
+    lock = threading.RLock()
+
+    @classmethod
+    def set_target(cls, path):
+        with open(path, 'rb') as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if os.fstat(f.fileno()).st_size else b''
+        with cls.lock:
+            old, cls.file_path, cls.file_map = cls.file_map, path, mm
+            if old: old.close()
+
+    @classmethod
+    def read(cls, offset, length):
+        if offset < 0: raise ValueError("Negative offset")
+        with cls.lock:
+            return cls.file_map[offset:offset + length]
+
+    @classmethod
+    def find(cls, needle, limit=1):
+        """Offsets of up to `limit` (possibly overlapping) matches, each one C-level find over the map.
+        The lock is held per find, not for the whole scan, so /read is not queued behind a find-all;
+        a target swapped mid-search ends it."""
+        hits, pos = [], 0
+        # The map is only ever touched under the lock, and only while it is still current:
+        # a concurrent set_target closes the one it replaces
+        with cls.lock:
+            mm = cls.file_map
+            if not mm: return hits
+        while len(hits) < limit:
+            with cls.lock:
+                if cls.file_map is not mm: break
+                pos = mm.find(needle, pos)
+            if pos == -1: break
+            hits.append(pos)
+            pos += 1
+        return hits
 
 class ByteServer(http.server.BaseHTTPRequestHandler):
+    # Keep-alive: the viewer's /data and /read fetches reuse one connection instead of a
+    # TCP handshake + handler thread each. Every response must therefore carry Content-Length.
+    protocol_version = "HTTP/1.1"
+
     def do_GET(self):
         parsed = urllib.parse.urlparse(self.path)
         q = urllib.parse.parse_qs(parsed.query)
@@ -22,17 +87,31 @@ class ByteServer(http.server.BaseHTTPRequestHandler):
 
         if parsed.path == "/":
             self._send_html(ReportGenerator.get_html(ctx.file_path, ctx.config['name'], ctx.engine))
+
+        elif parsed.path == "/style.css":
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/css')
+            self.send_header('Content-Length', str(len(ReportGenerator.STYLE_BYTES)))
+            self.send_header('Cache-Control', 'max-age=3600')
+            self.end_headers()
+            self.wfile.write(ReportGenerator.STYLE_BYTES)
         
-        elif parsed.path == "/data":
+        elif parsed.path in ("/data", "/agg"):
             p, s = int(q.get('page', [0])[0]), int(q.get('size', [5000])[0])
-            chunks, anom = ctx.engine.get_page(p, s)
-            self._send_json({"chunks": chunks, "anom": anom, "total": ctx.engine.get_total_count()})
+            if parsed.path == "/agg":
+                # Level-of-detail page: one row per `bucket` chunks
+                body = ctx.engine.get_agg_packed(p, s, max(1, int(q.get('bucket', [1])[0])))
+            else:
+                body = ctx.engine.get_page_packed(p, s)
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/octet-stream')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
             
         elif parsed.path == "/read":
             off, length = int(q['offset'][0]), min(int(q['length'][0]), 8192)
-            with open(ctx.file_path, 'rb') as f:
-                f.seek(off)
-                data = f.read(length)
+            data = ctx.read(off, length)
             self._send_json({"hex": data.hex(), "arch": ArchID.identify(data)})
 
         elif parsed.path == "/download":
@@ -41,6 +120,9 @@ class ByteServer(http.server.BaseHTTPRequestHandler):
         elif parsed.path == "/search":
             self._handle_search(q, ctx)
 
+        else:
+            self.send_error(404)
+
     def do_POST(self):
         if self.path == "/load":
             length = int(self.headers['Content-Length'])
@@ -48,52 +130,88 @@ class ByteServer(http.server.BaseHTTPRequestHandler):
             new_path = params.get('filepath', [''])[0]
             
             if os.path.exists(new_path):
-                ServerContext.file_path = new_path
+                ServerContext.set_target(new_path)
                 conf = ServerContext.config
                 scanner = FixedScanner(conf["size"]) if conf["mode"] == "FIXED" else SentinelScanner(b'\x00', conf["size"])
-                Processor.run(scanner, new_path, ServerContext.engine, conf["window"])
+                # Fresh engine per target: paging and search rely on ids running 1..N for this file,
+                # and the spectral sidecar and cached counts must not carry over from the last one
+                old, ServerContext.engine = ServerContext.engine, DataEngine()
+                if old: old.close()
+                Processor.run(scanner, new_path, ServerContext.engine, conf["window"], conf["batch"])
                 self.send_response(303)
                 self.send_header('Location', '/')
+                self.send_header('Content-Length', '0')
                 self.end_headers()
             else:
                 self.send_error(400, "File not found")
+        else:
+            self.send_error(404)
 
     def _handle_download(self, q, ctx):
         mode = q.get('mode', ['bin'])[0]
         if mode == "bmp":
-            data = BMPGenerator.create_bmp(ctx.engine.get_all_spectral_data())
-            self._send_bin(data, "scan_viz.bmp", "image/bmp")
+            # Rows are cut from the mmapped sidecar and written as they are padded
+            size, parts = BMPGenerator.stream_bmp_from_bgr(ctx.engine.get_spectral_bgr())
+            self._send_stream(parts, size, "scan_viz.bmp", "image/bmp")
         elif mode == "txt":
             # (Text export logic similar to original)
-            pass 
+            self.send_error(501)
         else:
             off, length = int(q['offset'][0]), int(q['length'][0])
             with open(ctx.file_path, 'rb') as f:
-                f.seek(off)
-                self._send_bin(f.read(length), f"extract_{off:X}.bin", "application/octet-stream")
+                # Clamp to EOF so the advertised Content-Length is what actually gets sent
+                length = max(0, min(length, os.fstat(f.fileno()).st_size - off))
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/octet-stream')
+                self.send_header('Content-Disposition', f'attachment; filename="extract_{off:X}.bin"')
+                self.send_header('Content-Length', str(length))
+                self.end_headers()
+                _sendfile_range(self.wfile, f, off, length)
 
     def _handle_search(self, q, ctx):
-        # (Search logic moved here)
-        pass
+        try:
+            needle = binascii.unhexlify(q['hex'][0].replace(" ", "").replace("0x", ""))
+            if not needle: raise ValueError("Empty search pattern")
+            # all=1 lists every match (up to SEARCH_MAX_HITS) with its chunk index, for stepping through
+            find_all = q.get('all', ['0'])[0] == '1'
+            hits = ctx.find(needle, SEARCH_MAX_HITS + 1 if find_all else 1)
+            if not hits: return self._send_json({"found": False})
+            res = {"found": True, "offset": hits[0], "index": ctx.engine.chunk_index(hits[0])}
+            if find_all:
+                res["offsets"] = hits[:SEARCH_MAX_HITS]
+                res["indices"] = ctx.engine.chunk_indices(res["offsets"])
+                res["truncated"] = len(hits) > SEARCH_MAX_HITS
+            self._send_json(res)
+        except Exception as e:
+            self._send_json({"found": False, "error": str(e)})
 
     def _send_json(self, data):
+        self._send_json_bytes(json_bytes(data))
+
+    def _send_json_bytes(self, body):
         self.send_response(200)
         self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
         self.end_headers()
-        self.wfile.write(json.dumps(data).encode())
+        self.wfile.write(body)
 
-    def _send_html(self, content):
+    def _send_html(self, parts):
         self.send_response(200)
         self.send_header('Content-Type', 'text/html')
+        self.send_header('Content-Length', str(sum(map(len, parts))))
+        self.send_header('Cache-Control', 'no-store')
         self.end_headers()
-        self.wfile.write(content.encode('utf-8'))
+        for part in parts:
+            self.wfile.write(part)
 
-    def _send_bin(self, data, fname, ctype):
+    def _send_stream(self, parts, size, fname, ctype):
         self.send_response(200)
         self.send_header('Content-Type', ctype)
         self.send_header('Content-Disposition', f'attachment; filename="{fname}"')
+        self.send_header('Content-Length', str(size))
         self.end_headers()
-        self.wfile.write(data)
+        for part in parts:
+            self.wfile.write(part)
 
 class ThreadedHTTPServer(socketserver.ThreadingMixIn, http.server.HTTPServer):
     daemon_threads = True